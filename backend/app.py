@@ -1,11 +1,37 @@
+import hashlib
+import hmac
+import json
+import math
+import os
+import re
+import threading
+import time
 from datetime import datetime
 from bson.objectid import ObjectId
-from flask import Flask, jsonify, request
+from flask import Flask, g, has_request_context, request, stream_with_context
 from flask_cors import CORS
-from mongita import MongitaClientDisk
 from werkzeug.security import generate_password_hash, check_password_hash
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # invoice totals fall back to a plain Python loop
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # long invoices are summed with numpy (or Python)
+    njit = None
+
+from sqlite_store import SQLiteClient
+
 app = Flask(__name__)
+# Seconds a successful login is remembered (skips re-hashing); 0 disables
+app.config.setdefault("AUTH_CACHE_TTL", 300)
 
 # CORS: allow React dev (localhost:5173) to call this API
 CORS(
@@ -18,6 +44,17 @@ CORS(
 )
 
 
+@app.before_request
+def short_circuit_preflight():
+    """
+    Answer CORS preflight requests for /api/* right away,
+    without dispatching to the view functions.
+    after_request will add the CORS headers.
+    """
+    if request.method == "OPTIONS" and request.path.startswith("/api/"):
+        return ("", 204)
+
+
 @app.after_request
 def add_cors_headers(response):
     """
@@ -37,53 +74,250 @@ def add_cors_headers(response):
         "Access-Control-Allow-Methods",
         "GET, POST, PUT, DELETE, OPTIONS",
     )
+    if request.method == "OPTIONS":
+        # Let the browser cache the preflight result for a day
+        response.headers.setdefault("Access-Control-Max-Age", "86400")
     return response
 
 
-client = MongitaClientDisk()
+# Storage backend: "sqlite" (default) or "mongita" (the original embedded
+# store). An existing ~/.mongita database is imported into SQLite once.
+DB_BACKEND = os.getenv("INVENTORY_DB", "sqlite")
+if DB_BACKEND == "mongita":
+    from mongita import MongitaClientDisk
+
+    client = MongitaClientDisk()
+else:
+    client = SQLiteClient(os.getenv("INVENTORY_DB_DIR"))
 db = client["inventory_db"]
 items_col = db["items"]
 invoices_col = db["invoices"]
 users_col = db["users"]
 receipts_col = db["receipts"]  # store received-stock records
+meta_col = db["meta"]  # app bookkeeping (e.g. last batch number)
+
+MONGITA_DIR = os.path.join(os.path.expanduser("~"), ".mongita")
+
+
+def import_mongita_data(target, mongita_dir):
+    """
+    One-time copy of an existing Mongita inventory_db into the SQLite store,
+    so switching the default backend keeps earlier data. Everything (plus
+    the "mongita_import" marker) is written in one transaction, so a failed
+    import leaves SQLite untouched and is retried on the next start.
+    Returns the number of documents copied.
+    """
+    names = ("items", "invoices", "users", "receipts", "meta")
+    if not os.path.isdir(os.path.join(mongita_dir, "inventory_db")):
+        return 0
+    if target["meta"].find_one({"_id": "mongita_import"}):
+        return 0
+    if any(target[name].count_documents({}) for name in names):
+        # SQLite already in use (created before this import existed)
+        return 0
+
+    from mongita import MongitaClientDisk
+
+    source = MongitaClientDisk(host=mongita_dir)["inventory_db"]
+    copied = 0
+    try:
+        with target.transaction():
+            for name in names:
+                docs = list(source[name].find({}))
+                if docs:
+                    target[name].insert_many(docs)
+                    copied += len(docs)
+            target["meta"].replace_one(
+                {"_id": "mongita_import"}, {"documents": copied}, upsert=True
+            )
+    except Exception:
+        # Refuse to start (and seed sample data over an empty store)
+        app.logger.exception("Importing %s failed; nothing was copied", mongita_dir)
+        raise
+    return copied
+
+
+if DB_BACKEND == "sqlite":
+    import_mongita_data(db, MONGITA_DIR)
+
+
+def ensure_index(col, key, direction=1):
+    """Create a single-key index unless it already exists."""
+    name = f"{key}_{direction}"
+    if not any(name in info for info in col.index_information()):
+        col.create_index([(key, direction)])
+
+
+# login / create_user look users up by username on every call
+ensure_index(users_col, "username")
+if DB_BACKEND == "sqlite":
+    # SQLite serves the newest-first listings straight from these indexes
+    # (Mongita only uses indexes for filters, so skip them there).
+    ensure_index(invoices_col, "printedAt", -1)
+    ensure_index(receipts_col, "receivedAt", -1)
 
 # -----------------------------
 # Helpers (JSON conversion)
 # -----------------------------
 
 
+# Types _to_jsonable has to look at; everything else is already JSON-safe
+_CONVERT_TYPES = (ObjectId, datetime, list, dict)
+
+
 def _to_jsonable(value):
     """
-    Recursively convert Mongo/Mongita types to JSON-safe types:
+    Recursively convert BSON types to JSON-safe types:
       - ObjectId -> str
       - datetime -> ISO string
-      - list / dict -> walk through children
+      - list / dict -> converted IN PLACE (no copies)
+    Only call this on data that is about to be encoded and that the
+    caller owns (documents fresh from a cursor, dicts built per request).
     """
+    if not isinstance(value, _CONVERT_TYPES):
+        return value
     if isinstance(value, ObjectId):
         return str(value)
     if isinstance(value, datetime):
         return value.isoformat()
     if isinstance(value, list):
-        return [_to_jsonable(v) for v in value]
-    if isinstance(value, dict):
-        return {k: _to_jsonable(v) for k, v in value.items()}
+        for i, v in enumerate(value):
+            if isinstance(v, _CONVERT_TYPES):
+                value[i] = _to_jsonable(v)
+        return value
+    for k, v in value.items():
+        if isinstance(v, _CONVERT_TYPES):
+            value[k] = _to_jsonable(v)
     return value
 
 
 def doc_to_dict(doc):
-    """Convert a Mongo/Mongita document to a fully JSON-safe dict."""
+    """
+    Promote a stored document's _id to id (in place).
+    ObjectId / datetime values are converted when the response is encoded.
+    """
     if not doc:
         return None
 
-    raw = dict(doc)
-    raw = _to_jsonable(raw)
+    if "_id" in doc:
+        doc["id"] = doc.pop("_id")
+
+    return doc
+
+
+_OID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+
+def _parse_oid(value):
+    """ObjectId for a 24-hex-digit string, None for anything else."""
+    if isinstance(value, str) and _OID_RE.fullmatch(value):
+        return ObjectId(value)
+    return None
+
+
+def _json_default(value):
+    """orjson hook for the types it does not know (ObjectId)."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _json_bytes(obj):
+    """Encode obj as JSON bytes (orjson if installed, else stdlib json)."""
+    if orjson is not None:
+        # orjson writes naive datetimes in the same ISO format as isoformat()
+        return orjson.dumps(
+            obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(_to_jsonable(obj)).encode("utf-8")
+
+
+def ojsonify(obj, status=200):
+    """Build a JSON response for obj in a single serialization pass."""
+    return app.response_class(
+        _json_bytes(obj), status=status, mimetype="application/json"
+    )
+
 
-    # Promote _id to id
-    if "_id" in raw:
-        raw["id"] = raw["_id"]
-        del raw["_id"]
+def json_array_response(docs, transform=doc_to_dict):
+    """
+    Streamed JSON array response for docs (e.g. a cursor): documents are
+    converted and encoded one at a time, so neither the dicts nor the
+    whole body are held in memory.
+    The first document is encoded before the response is returned, so an
+    error there (bad data, a bug in transform) is still a normal error
+    response; a later one can only cut the stream short.
+    """
+    docs = iter(docs)
+    first = next(docs, None)
+    if first is None:
+        return app.response_class(b"[]", mimetype="application/json")
+    head = b"[" + _json_bytes(transform(first))
+
+    def generate():
+        yield head
+        for d in docs:
+            yield b"," + _json_bytes(transform(d))
+        yield b"]"
+
+    return app.response_class(
+        stream_with_context(generate()), mimetype="application/json"
+    )
 
-    return raw
+
+def request_now():
+    """
+    UTC timestamp of the current request (read from the clock once and
+    shared via flask.g); outside a request, just the current time.
+    """
+    if not has_request_context():
+        return datetime.utcnow()
+    if "now" not in g:
+        g.now = datetime.utcnow()
+    return g.now
+
+
+# -----------------------------
+# Response cache (items / stats)
+# -----------------------------
+
+# Encoded bodies of GET /api/items (no search) and GET /api/stats.
+# Every endpoint that changes items calls invalidate_item_caches().
+_items_cache = {}
+_stats_cache = {}
+_item_cache_generation = 0
+_item_cache_lock = threading.Lock()
+
+
+def invalidate_item_caches():
+    """Drop cached item responses after any write to items_col."""
+    global _item_cache_generation
+    with _item_cache_lock:
+        _item_cache_generation += 1
+        _items_cache.clear()
+        _stats_cache.clear()
+
+
+def cached_json_response(cache, build):
+    """
+    Serve build()'s JSON from cache (encoding it on a miss), with an ETag
+    so repeat clients get 304 Not Modified instead of the body.
+    """
+    entry = cache.get("entry")
+    if entry is None:
+        generation = _item_cache_generation
+        body = _json_bytes(build())
+        entry = (body, hashlib.md5(body, usedforsecurity=False).hexdigest())
+        with _item_cache_lock:
+            # Don't store a body built from data that changed meanwhile
+            if generation == _item_cache_generation:
+                cache["entry"] = entry
+
+    body, etag = entry
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 # -----------------------------
@@ -91,11 +325,35 @@ def doc_to_dict(doc):
 # -----------------------------
 
 
+def _load_batch_counter():
+    """Last used batch sequence number (falls back to the item count)."""
+    meta = meta_col.find_one({"_id": "batch"})
+    if meta:
+        return int(meta.get("n") or 0)
+    return items_col.count_documents({})
+
+
+_batch_counter = _load_batch_counter()
+_batch_lock = threading.Lock()
+
+
+def generate_batch_numbers(n):
+    """
+    Reserve n consecutive batch numbers like BATCH-2025-003
+    (one counter update no matter how many are requested).
+    """
+    global _batch_counter
+    with _batch_lock:
+        first = _batch_counter + 1
+        _batch_counter += n
+        meta_col.replace_one({"_id": "batch"}, {"n": _batch_counter}, upsert=True)
+    year = request_now().year
+    return [f"BATCH-{year}-{str(count).zfill(3)}" for count in range(first, first + n)]
+
+
 def generate_batch_number():
-    """Generate batch number like BATCH-2025-003 based on count."""
-    count = items_col.count_documents({})
-    year = datetime.now().year
-    return f"BATCH-{year}-{str(count + 1).zfill(3)}"
+    """Generate batch number like BATCH-2025-003 from a cached counter."""
+    return generate_batch_numbers(1)[0]
 
 
 def seed_items_if_empty():
@@ -171,9 +429,9 @@ def seed_items_if_empty():
         },
     ]
 
-    for itm in demo_items:
-        itm["batchNumber"] = generate_batch_number()
-        items_col.insert_one(itm)
+    for itm, batch in zip(demo_items, generate_batch_numbers(len(demo_items))):
+        itm["batchNumber"] = batch
+    items_col.insert_many(demo_items)
 
 
 def seed_users_if_empty():
@@ -197,14 +455,58 @@ def seed_users_if_empty():
     )
 
 
+def _stored_number(value, kind):
+    """kind(value) for a stored field, or 0 if it is not a finite number."""
+    try:
+        number = float(value or 0)
+    except (TypeError, ValueError):
+        return kind(0)
+    return kind(number) if math.isfinite(number) else kind(0)
+
+
+def migrate_item_numbers():
+    """
+    One-time fix-up so every item stores quantity / minStockLevel as int
+    and price as float. Readers can then use the values without coercion.
+    """
+    if meta_col.find_one({"_id": "items_numeric"}):
+        return
+
+    for d in items_col.find({}):
+        fixed = {
+            "quantity": _stored_number(d.get("quantity"), int),
+            "minStockLevel": _stored_number(d.get("minStockLevel"), int),
+            "price": _stored_number(d.get("price"), float),
+        }
+        if any(type(d.get(k)) is not type(v) for k, v in fixed.items()):
+            d.update(fixed)
+            items_col.replace_one({"_id": d["_id"]}, d)
+
+    meta_col.replace_one({"_id": "items_numeric"}, {"done": True}, upsert=True)
+
+
 seed_items_if_empty()
 seed_users_if_empty()
+migrate_item_numbers()
 
 # -----------------------------
 # ITEMS / INVENTORY
 # -----------------------------
 
 
+def _parse_price(value):
+    """float(value or 0); NaN / Infinity raise ValueError."""
+    price = float(value or 0)
+    if not math.isfinite(price):
+        raise ValueError(f"price must be a finite number, got {value!r}")
+    return price
+
+
+# Serializes every write to an item (stock changes, edits, deletes) so a
+# read-modify-write in change_stock never interleaves with another write.
+_stock_lock = threading.Lock()
+
+
 @app.route("/api/items", methods=["GET"])
 def list_items():
     """
@@ -213,22 +515,22 @@ def list_items():
       - search: filters by name/sku/category (case-insensitive)
     """
     search = request.args.get("search", "").strip().lower()
-    docs = list(items_col.find({}))
 
-    result = []
-    for d in docs:
-        d = doc_to_dict(d)
-        if not search:
-            result.append(d)
-        else:
-            if (
-                search in (d.get("name", "").lower())
-                or search in (d.get("sku", "").lower())
-                or search in (d.get("category", "").lower())
-            ):
-                result.append(d)
+    if not search:
+        return cached_json_response(
+            _items_cache, lambda: [doc_to_dict(d) for d in items_col.find({})]
+        )
 
-    return jsonify(result), 200
+    # The stores have no $regex / $or, so match on the raw documents
+    # and only convert the ones that are returned.
+    matches = (
+        d
+        for d in items_col.find({})
+        if search in (d.get("name") or "").lower()
+        or search in (d.get("sku") or "").lower()
+        or search in (d.get("category") or "").lower()
+    )
+    return json_array_response(matches)
 
 
 @app.route("/api/items", methods=["POST"])
@@ -243,18 +545,18 @@ def create_item():
     try:
         data = request.get_json(force=True) or {}
     except Exception as e:
-        return jsonify({"error": f"Invalid JSON: {e}"}), 400
+        return ojsonify({"error": f"Invalid JSON: {e}"}, 400)
 
     name = (data.get("name") or "").strip()
     if not name:
-        return jsonify({"error": "Missing or empty 'name'"}), 400
+        return ojsonify({"error": "Missing or empty 'name'"}, 400)
 
     try:
         quantity = int(data.get("quantity") or 0)
         min_stock = int(data.get("minStockLevel") or 0)
-        price = float(data.get("price") or 0)
+        price = _parse_price(data.get("price"))
     except Exception as e:
-        return jsonify({"error": f"Bad numeric field: {e}"}), 400
+        return ojsonify({"error": f"Bad numeric field: {e}"}, 400)
 
     item = {
         "name": name,
@@ -273,32 +575,31 @@ def create_item():
 
     try:
         res = items_col.insert_one(item)
+        invalidate_item_caches()
         item["_id"] = res.inserted_id
-        return jsonify(doc_to_dict(item)), 201
+        return ojsonify(doc_to_dict(item), 201)
     except Exception as e:
-        return jsonify({"error": f"DB insert failed: {e}"}), 500
+        return ojsonify({"error": f"DB insert failed: {e}"}, 500)
 
 
 @app.route("/api/items/<item_id>", methods=["GET"])
 def get_item(item_id):
-    try:
-        oid = ObjectId(item_id)
-    except Exception:
-        return jsonify({"error": "Invalid item id"}), 400
+    oid = _parse_oid(item_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid item id"}, 400)
 
     doc = items_col.find_one({"_id": oid})
     if not doc:
-        return jsonify({"error": "Item not found"}), 404
+        return ojsonify({"error": "Item not found"}, 404)
 
-    return jsonify(doc_to_dict(doc)), 200
+    return ojsonify(doc_to_dict(doc))
 
 
 @app.route("/api/items/<item_id>", methods=["PUT"])
 def update_item(item_id):
-    try:
-        oid = ObjectId(item_id)
-    except Exception:
-        return jsonify({"error": "Invalid item id"}), 400
+    oid = _parse_oid(item_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid item id"}, 400)
 
     data = request.get_json(force=True) or {}
 
@@ -318,35 +619,63 @@ def update_item(item_id):
     ]:
         if field in data:
             value = data[field]
-            if field in ("quantity", "minStockLevel"):
-                value = int(value)
-            if field == "price":
-                value = float(value)
+            try:
+                if field in ("quantity", "minStockLevel"):
+                    value = int(value or 0)
+                if field == "price":
+                    value = _parse_price(value)
+            except (TypeError, ValueError, OverflowError) as e:
+                return ojsonify({"error": f"Bad numeric field: {e}"}, 400)
             update_fields[field] = value
 
     if not update_fields:
-        return jsonify({"error": "Nothing to update"}), 400
+        return ojsonify({"error": "Nothing to update"}, 400)
 
-    result = items_col.update_one({"_id": oid}, {"$set": update_fields})
+    with _stock_lock:
+        result = items_col.update_one({"_id": oid}, {"$set": update_fields})
     if result.matched_count == 0:
-        return jsonify({"error": "Item not found"}), 404
+        return ojsonify({"error": "Item not found"}, 404)
+    invalidate_item_caches()
 
     doc = items_col.find_one({"_id": oid})
-    return jsonify(doc_to_dict(doc)), 200
+    return ojsonify(doc_to_dict(doc))
 
 
 @app.route("/api/items/<item_id>", methods=["DELETE"])
 def delete_item(item_id):
-    try:
-        oid = ObjectId(item_id)
-    except Exception:
-        return jsonify({"error": "Invalid item id"}), 400
+    oid = _parse_oid(item_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid item id"}, 400)
 
-    result = items_col.delete_one({"_id": oid})
+    with _stock_lock:
+        result = items_col.delete_one({"_id": oid})
     if result.deleted_count == 0:
-        return jsonify({"error": "Item not found"}), 404
+        return ojsonify({"error": "Item not found"}, 404)
+    invalidate_item_caches()
+
+    return ojsonify({"status": "ok"})
+
 
-    return jsonify({"status": "ok"}), 200
+def change_stock(oid, *deltas):
+    """
+    Add each delta to an item's quantity in turn, clamping at 0 after every
+    step (as applying them one by one would), as one read-modify-write.
+    Returns (previous quantity, updated item doc), or (None, None) if the
+    item does not exist. The stores have no find_one_and_update, so this
+    holds _stock_lock, which update_item / delete_item also take; only
+    quantity is written back, so other fields are never overwritten.
+    """
+    with _stock_lock:
+        doc = items_col.find_one({"_id": oid})
+        if not doc:
+            return None, None
+        old_qty = new_qty = doc["quantity"]
+        for delta in deltas:
+            new_qty = max(0, new_qty + delta)
+        items_col.update_one({"_id": oid}, {"$set": {"quantity": new_qty}})
+        doc["quantity"] = new_qty
+    invalidate_item_caches()
+    return old_qty, doc
 
 
 @app.route("/api/items/<item_id>/adjust_stock", methods=["POST"])
@@ -360,30 +689,26 @@ def adjust_stock(item_id):
       2) If delta > 0, create a receipt record in `receipts_col`
          so you have a permanent log of received stock.
     """
-    try:
-        oid = ObjectId(item_id)
-    except Exception:
-        return jsonify({"error": "Invalid item id"}), 400
+    oid = _parse_oid(item_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid item id"}, 400)
 
     data = request.get_json(force=True) or {}
     try:
         delta = int(data.get("delta") or 0)
     except Exception as e:
-        return jsonify({"error": f"Bad delta value: {e}"}), 400
+        return ojsonify({"error": f"Bad delta value: {e}"}, 400)
 
     changed_by = data.get("changedBy") or None
 
-    doc = items_col.find_one({"_id": oid})
-    if not doc:
-        return jsonify({"error": "Item not found"}), 404
-
     # 1) Update stock
-    new_qty = max(0, int(doc.get("quantity") or 0) + delta)
-    items_col.update_one({"_id": oid}, {"$set": {"quantity": new_qty}})
+    _, doc = change_stock(oid, delta)
+    if not doc:
+        return ojsonify({"error": "Item not found"}, 404)
 
     # 2) If stock is increased, record a receipt
     if delta > 0:
-        now = datetime.utcnow()
+        now = request_now()
         receipt_doc = {
             "itemId": oid,
             "sku": doc.get("sku") or "",
@@ -395,8 +720,7 @@ def adjust_stock(item_id):
         }
         receipts_col.insert_one(receipt_doc)
 
-    updated = items_col.find_one({"_id": oid})
-    return jsonify(doc_to_dict(updated)), 200
+    return ojsonify(doc_to_dict(doc))
 
 
 # -----------------------------
@@ -404,12 +728,54 @@ def adjust_stock(item_id):
 # -----------------------------
 
 
-def compute_invoice_totals(inv_doc):
-    """Helper used by invoices endpoints and /api/stats if needed."""
-    lines = inv_doc.get("lines") or []
+# Invoices with at least this many lines are summed with numba / numpy
+VECTORIZE_MIN_LINES = 32
+
+
+def _subtotal_kernel(prices, qtys):
+    """Multiply-accumulate over price / quantity arrays (numba-compiled)."""
+    s = 0.0
+    for i in range(prices.shape[0]):
+        s += prices[i] * qtys[i]
+    return s
+
+
+if njit is not None and np is not None:
+    # cache=True stores the machine code next to app.py, so only the very
+    # first start pays the compile time; warm it up now, not on a request.
+    _subtotal_kernel = njit(cache=True)(_subtotal_kernel)
+    _subtotal_kernel(np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.int64))
+else:
+    _subtotal_kernel = None
+
+
+def _lines_subtotal(lines):
+    """
+    Sum of price * quantity over invoice lines.
+    Invoices are not migrated, so older lines may hold None / strings.
+    """
+    n = len(lines)
+    if np is not None and n >= VECTORIZE_MIN_LINES:
+        prices = np.fromiter(
+            (float(l.get("price") or 0) for l in lines), dtype=np.float64, count=n
+        )
+        qtys = np.fromiter(
+            (int(l.get("quantity") or 0) for l in lines), dtype=np.int64, count=n
+        )
+        if _subtotal_kernel is not None:
+            return _subtotal_kernel(prices, qtys)
+        return float((prices * qtys).sum())
+
     subtotal = 0.0
     for l in lines:
         subtotal += float(l.get("price") or 0) * int(l.get("quantity") or 0)
+    return subtotal
+
+
+def compute_invoice_totals(inv_doc):
+    """Helper used by invoices endpoints and /api/stats if needed."""
+    lines = inv_doc.get("lines") or []
+    subtotal = _lines_subtotal(lines)
 
     tax_rate = float(inv_doc.get("taxRate") or 0)
     discount_rate = float(inv_doc.get("discountRate") or 0)
@@ -429,6 +795,13 @@ def compute_invoice_totals(inv_doc):
     }
 
 
+def invoice_to_dict(inv_doc):
+    """doc_to_dict plus the computed totals."""
+    inv_dict = doc_to_dict(inv_doc)
+    inv_dict["totals"] = compute_invoice_totals(inv_dict)
+    return inv_dict
+
+
 # -----------------------------
 # SALES / INVOICES
 # -----------------------------
@@ -440,17 +813,8 @@ def list_invoices():
     GET /api/invoices
     returns all invoices with totals calculated on the backend
     """
-    docs = list(invoices_col.find({}))
-    # Sort in Python to avoid Mongita datetime issues
-    docs.sort(key=lambda d: str(d.get("printedAt") or ""), reverse=True)
-
-    result = []
-    for inv in docs:
-        inv_dict = doc_to_dict(inv)
-        inv_dict["totals"] = compute_invoice_totals(inv)
-        result.append(inv_dict)
-
-    return jsonify(result), 200
+    docs = invoices_col.find({}, sort=[("printedAt", -1)])
+    return json_array_response(docs, invoice_to_dict)
 
 
 @app.route("/api/invoices", methods=["POST"])
@@ -480,17 +844,17 @@ def create_invoice():
     lines = data.get("lines") or []
 
     if not number or not lines:
-        return jsonify({"error": "number and lines are required"}), 400
+        return ojsonify({"error": "number and lines are required"}, 400)
 
     printed_at_str = data.get("printedAt")
     if printed_at_str:
         try:
             dt = datetime.fromisoformat(printed_at_str.replace("Z", "+00:00"))
         except Exception:
-            dt = datetime.utcnow()
+            dt = request_now()
         printed_at = dt.replace(tzinfo=None)  # store naive
     else:
-        printed_at = datetime.utcnow()
+        printed_at = request_now()
 
     tax_rate = float(data.get("taxRate") or 0)
     discount_rate = float(data.get("discountRate") or 0)
@@ -502,10 +866,7 @@ def create_invoice():
     norm_lines = []
     for l in lines:
         item_id_str = l.get("itemId")
-        try:
-            item_oid = ObjectId(item_id_str) if item_id_str else None
-        except Exception:
-            item_oid = None
+        item_oid = _parse_oid(item_id_str)
 
         norm_lines.append(
             {
@@ -531,39 +892,32 @@ def create_invoice():
     # Optionally apply stock change here
     apply_stock = bool(data.get("applyStockChange"))
     if apply_stock:
+        # Group line quantities per item (in line order) so each item is
+        # read and written once; change_stock still clamps line by line.
+        sold_by_item = {}
         for line in norm_lines:
             if line["itemId"]:
-                doc = items_col.find_one({"_id": line["itemId"]})
-                if doc:
-                    new_qty = max(
-                        0,
-                        int(doc.get("quantity") or 0) - int(line["quantity"] or 0),
-                    )
-                    items_col.update_one(
-                        {"_id": line["itemId"]}, {"$set": {"quantity": new_qty}}
-                    )
+                sold_by_item.setdefault(line["itemId"], []).append(-line["quantity"])
+
+        for item_oid, deltas in sold_by_item.items():
+            change_stock(item_oid, *deltas)
 
     res = invoices_col.insert_one(invoice)
     invoice["_id"] = res.inserted_id
-    inv_dict = doc_to_dict(invoice)
-    inv_dict["totals"] = compute_invoice_totals(invoice)
-    return jsonify(inv_dict), 201
+    return ojsonify(invoice_to_dict(invoice), 201)
 
 
 @app.route("/api/invoices/<invoice_id>", methods=["GET"])
 def get_invoice(invoice_id):
-    try:
-        oid = ObjectId(invoice_id)
-    except Exception:
-        return jsonify({"error": "Invalid invoice id"}), 400
+    oid = _parse_oid(invoice_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid invoice id"}, 400)
 
     doc = invoices_col.find_one({"_id": oid})
     if not doc:
-        return jsonify({"error": "Invoice not found"}), 404
+        return ojsonify({"error": "Invoice not found"}, 404)
 
-    inv_dict = doc_to_dict(doc)
-    inv_dict["totals"] = compute_invoice_totals(doc)
-    return jsonify(inv_dict), 200
+    return ojsonify(invoice_to_dict(doc))
 
 
 @app.route("/api/invoices/<invoice_id>", methods=["PUT"])
@@ -573,10 +927,9 @@ def update_invoice(invoice_id):
     body: partial invoice (same shape as create, but we do NOT touch stock here)
     This matches your React behavior: editing invoice doesn't change stock.
     """
-    try:
-        oid = ObjectId(invoice_id)
-    except Exception:
-        return jsonify({"error": "Invalid invoice id"}), 400
+    oid = _parse_oid(invoice_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid invoice id"}, 400)
 
     data = request.get_json(force=True) or {}
     update_fields = {}
@@ -597,10 +950,7 @@ def update_invoice(invoice_id):
         norm_lines = []
         for l in data.get("lines") or []:
             item_id_str = l.get("itemId")
-            try:
-                item_oid = ObjectId(item_id_str) if item_id_str else None
-            except Exception:
-                item_oid = None
+            item_oid = _parse_oid(item_id_str)
 
             norm_lines.append(
                 {
@@ -614,16 +964,14 @@ def update_invoice(invoice_id):
         update_fields["lines"] = norm_lines
 
     if not update_fields:
-        return jsonify({"error": "Nothing to update"}), 400
+        return ojsonify({"error": "Nothing to update"}, 400)
 
     res = invoices_col.update_one({"_id": oid}, {"$set": update_fields})
     if res.matched_count == 0:
-        return jsonify({"error": "Invoice not found"}), 404
+        return ojsonify({"error": "Invoice not found"}, 404)
 
     doc = invoices_col.find_one({"_id": oid})
-    inv_dict = doc_to_dict(doc)
-    inv_dict["totals"] = compute_invoice_totals(doc)
-    return jsonify(inv_dict), 200
+    return ojsonify(invoice_to_dict(doc))
 
 
 # -----------------------------
@@ -631,7 +979,7 @@ def update_invoice(invoice_id):
 # -----------------------------
 
 
-@app.route("/api/receipts", methods=["GET", "POST", "OPTIONS"])
+@app.route("/api/receipts", methods=["GET", "POST"])
 def receipts():
     """
     GET /api/receipts
@@ -644,59 +992,43 @@ def receipts():
          and creates a receipt record.
          Returns: { "updatedItem": {...}, "receipt": {...} }
     """
-    # --- Preflight for CORS ---
-    if request.method == "OPTIONS":
-        # after_request will add headers; 204 is fine for preflight
-        return ("", 204)
-
     # --- List receipts ---
     if request.method == "GET":
-        docs = list(receipts_col.find({}))
-        docs.sort(
-            key=lambda d: str(d.get("receivedAt") or d.get("createdAt") or ""),
-            reverse=True,
-        )
-        result = [doc_to_dict(d) for d in docs]
-        return jsonify(result), 200
+        docs = receipts_col.find({}, sort=[("receivedAt", -1)])
+        return json_array_response(docs)
 
     # --- Create receipt + increase stock (POST) ---
     data = request.get_json(force=True) or {}
 
     item_id_str = data.get("itemId")
     if not item_id_str:
-        return jsonify({"error": "itemId is required"}), 400
+        return ojsonify({"error": "itemId is required"}, 400)
 
-    try:
-        oid = ObjectId(item_id_str)
-    except Exception:
-        return jsonify({"error": "Invalid itemId"}), 400
+    oid = _parse_oid(item_id_str)
+    if oid is None:
+        return ojsonify({"error": "Invalid itemId"}, 400)
 
     try:
         qty = int(data.get("quantity") or 0)
     except Exception as e:
-        return jsonify({"error": f"Bad quantity value: {e}"}), 400
+        return ojsonify({"error": f"Bad quantity value: {e}"}, 400)
 
     if qty <= 0:
-        return jsonify({"error": "quantity must be > 0"}), 400
-
-    doc = items_col.find_one({"_id": oid})
-    if not doc:
-        return jsonify({"error": "Item not found"}), 404
-
-    old_qty = int(doc.get("quantity") or 0)
-    new_qty = max(0, old_qty + qty)
+        return ojsonify({"error": "quantity must be > 0"}, 400)
 
     # Update item stock
-    items_col.update_one({"_id": oid}, {"$set": {"quantity": new_qty}})
+    old_qty, doc = change_stock(oid, qty)
+    if not doc:
+        return ojsonify({"error": "Item not found"}, 404)
 
-    now = datetime.utcnow()
+    now = request_now()
     receipt_doc = {
         "itemId": oid,
         "sku": doc.get("sku") or "",
         "name": doc.get("name") or "",
         "quantity": qty,
         "previousQuantity": old_qty,
-        "newQuantity": new_qty,
+        "newQuantity": doc["quantity"],
         "receivedAt": now,
         "createdAt": now,
         "receivedBy": data.get("receivedBy") or None,
@@ -704,15 +1036,11 @@ def receipts():
     res = receipts_col.insert_one(receipt_doc)
     receipt_doc["_id"] = res.inserted_id
 
-    updated_item = items_col.find_one({"_id": oid})
-
-    return (
-        jsonify(
-            {
-                "updatedItem": doc_to_dict(updated_item),
-                "receipt": doc_to_dict(receipt_doc),
-            }
-        ),
+    return ojsonify(
+        {
+            "updatedItem": doc_to_dict(doc),
+            "receipt": doc_to_dict(receipt_doc),
+        },
         201,
     )
 
@@ -732,37 +1060,44 @@ def stats():
       - lowStockItems (names)
       - totalInventoryValue
       - uniqueCategoriesCount
+    Served from cache until the next change to items.
     """
-    docs = list(items_col.find({}))
+    return cached_json_response(_stats_cache, _build_stats)
+
 
+def _build_stats():
+    """Aggregate the dashboard numbers over all items."""
     total_quantity = 0
     low_stock_items = []
     total_value = 0.0
     categories = set()
 
-    for d in docs:
-        qty = int(d.get("quantity") or 0)
-        min_stock = int(d.get("minStockLevel") or 0)
-        price = float(d.get("price") or 0)
+    # Local aliases keep the per-document loop free of attribute lookups
+    add_category = categories.add
+    add_low_stock = low_stock_items.append
+
+    # Single pass straight over the cursor (no intermediate list).
+    # Numeric fields are stored typed (see migrate_item_numbers).
+    for d in items_col.find({}):
+        qty = d["quantity"]
+        min_stock = d["minStockLevel"]
         total_quantity += qty
-        total_value += qty * price
+        total_value += qty * d["price"]
 
         cat = d.get("category")
         if cat:
-            categories.add(cat)
+            add_category(cat)
 
         if min_stock > 0 and qty < min_stock:
-            low_stock_items.append(d.get("name") or "")
+            add_low_stock(d.get("name") or "")
 
-    return jsonify(
-        {
-            "totalQuantity": total_quantity,
-            "lowStockCount": len(low_stock_items),
-            "lowStockItems": low_stock_items,
-            "totalInventoryValue": round(total_value, 2),
-            "uniqueCategoriesCount": len(categories),
-        }
-    ), 200
+    return {
+        "totalQuantity": total_quantity,
+        "lowStockCount": len(low_stock_items),
+        "lowStockItems": low_stock_items,
+        "totalInventoryValue": round(total_value, 2),
+        "uniqueCategoriesCount": len(categories),
+    }
 
 
 # -----------------------------
@@ -770,37 +1105,72 @@ def stats():
 # -----------------------------
 
 
-@app.route("/api/login", methods=["POST", "OPTIONS"])
+# (username, passwordHash, password digest) -> expiry of a verified login.
+# The digest is keyed with a per-process secret; raw passwords are never kept.
+_auth_cache = {}
+_auth_cache_key = os.urandom(32)
+AUTH_CACHE_MAX_ENTRIES = 1024
+
+
+def verify_password(username, password_hash, password):
+    """check_password_hash with a short-lived cache of successful checks."""
+    ttl = app.config.get("AUTH_CACHE_TTL") or 0
+    if ttl <= 0:
+        return check_password_hash(password_hash, password)
+
+    digest = hmac.new(
+        _auth_cache_key, password.encode("utf-8"), hashlib.sha256
+    ).digest()
+    key = (username, password_hash, digest)
+    now = time.monotonic()
+
+    expires_at = _auth_cache.get(key)
+    if expires_at is not None and expires_at > now:
+        return True
+
+    if not check_password_hash(password_hash, password):
+        return False
+
+    if len(_auth_cache) >= AUTH_CACHE_MAX_ENTRIES:
+        _auth_cache.clear()
+    _auth_cache[key] = now + ttl
+    return True
+
+
+@app.route("/api/login", methods=["POST"])
 def login():
     """
     POST /api/login
     body: { "username": "...", "password": "..." }
     Returns: { "username": "...", "role": "admin"|"saler" } on success
     """
-    if request.method == "OPTIONS":
-        # Preflight handled by after_request; just return 204
-        return ("", 204)
-
     data = request.get_json(force=True) or {}
     username = (data.get("username") or "").strip()
     password = data.get("password") or ""
 
     if not username or not password:
-        return jsonify({"error": "username and password are required"}), 400
+        return ojsonify({"error": "username and password are required"}, 400)
 
     user = users_col.find_one({"username": username})
     if not user:
-        return jsonify({"error": "Invalid username or password"}), 401
+        return ojsonify({"error": "Invalid username or password"}, 401)
 
-    if not check_password_hash(user.get("passwordHash", ""), password):
-        return jsonify({"error": "Invalid username or password"}), 401
+    if not verify_password(username, user.get("passwordHash", ""), password):
+        return ojsonify({"error": "Invalid username or password"}, 401)
 
-    return jsonify(
+    return ojsonify(
         {
             "username": user["username"],
             "role": user.get("role", "saler"),
         }
-    ), 200
+    )
+
+
+def public_user_dict(doc):
+    """doc_to_dict without the password hash."""
+    user = doc_to_dict(doc)
+    user.pop("passwordHash", None)
+    return user
 
 
 @app.route("/api/users", methods=["GET"])
@@ -810,16 +1180,7 @@ def list_users():
     Returns all users WITHOUT password hashes.
     Used by the admin-only Users Management page in the frontend.
     """
-    docs = list(users_col.find({}))
-
-    public_users = []
-    for d in docs:
-        d = doc_to_dict(d)
-        if "passwordHash" in d:
-            del d["passwordHash"]
-        public_users.append(d)
-
-    return jsonify(public_users), 200
+    return json_array_response(users_col.find({}), public_user_dict)
 
 
 @app.route("/api/users", methods=["POST"])
@@ -835,29 +1196,25 @@ def create_user():
     role = data.get("role") or "saler"
 
     if not username or not password:
-        return jsonify({"error": "username and password are required"}), 400
+        return ojsonify({"error": "username and password are required"}, 400)
 
     if role not in ("admin", "saler"):
-        return jsonify({"error": "role must be 'admin' or 'saler'"}), 400
+        return ojsonify({"error": "role must be 'admin' or 'saler'"}, 400)
 
     # Check if username already exists
     if users_col.find_one({"username": username}):
-        return jsonify({"error": "Username already exists"}), 400
+        return ojsonify({"error": "Username already exists"}, 400)
 
     password_hash = generate_password_hash(password)
     doc = {
         "username": username,
         "passwordHash": password_hash,
         "role": role,
-        "createdAt": datetime.utcnow(),
+        "createdAt": request_now(),
     }
     res = users_col.insert_one(doc)
     doc["_id"] = res.inserted_id
-    user = doc_to_dict(doc)
-    if "passwordHash" in user:
-        del user["passwordHash"]
-
-    return jsonify(user), 201
+    return ojsonify(public_user_dict(doc), 201)
 
 
 @app.route("/api/users/<user_id>/password", methods=["PUT"])
@@ -866,23 +1223,25 @@ def change_user_password(user_id):
     PUT /api/users/<id>/password
     body: { "password": "newPassword" }
     """
-    try:
-        oid = ObjectId(user_id)
-    except Exception:
-        return jsonify({"error": "Invalid user id"}), 400
+    oid = _parse_oid(user_id)
+    if oid is None:
+        return ojsonify({"error": "Invalid user id"}, 400)
 
     data = request.get_json(force=True) or {}
     new_password = data.get("password") or ""
     if not new_password:
-        return jsonify({"error": "password is required"}), 400
+        return ojsonify({"error": "password is required"}, 400)
 
     password_hash = generate_password_hash(new_password)
 
     res = users_col.update_one({"_id": oid}, {"$set": {"passwordHash": password_hash}})
     if res.matched_count == 0:
-        return jsonify({"error": "User not found"}), 404
+        return ojsonify({"error": "User not found"}, 404)
 
-    return jsonify({"status": "ok"}), 200
+    # Forget cached logins so the old password stops working immediately
+    _auth_cache.clear()
+
+    return ojsonify({"status": "ok"})
 
 
 # -----------------------------
@@ -892,9 +1251,16 @@ def change_user_password(user_id):
 
 @app.route("/api/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok"}), 200
+    return ojsonify({"status": "ok"})
 
 
 if __name__ == "__main__":
+    # Development server only; in production run `gunicorn app:app`
+    # (see gunicorn.conf.py). Set FLASK_DEV=1 for debug mode + reloader.
     # Use 0.0.0.0 if you want other devices to access, else 127.0.0.1 is fine.
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    app.run(
+        host="127.0.0.1",
+        port=5000,
+        debug=bool(os.getenv("FLASK_DEV")),
+        threaded=True,
+    )
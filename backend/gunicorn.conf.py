@@ -0,0 +1,13 @@
+# gunicorn settings for serving the API (picked up automatically when
+# gunicorn is started from this folder):  gunicorn app:app
+#
+# The app keeps state in memory (batch counter, response and login caches)
+# that worker processes would not share, so run ONE worker process and get
+# concurrency from threads instead.
+import os
+
+bind = os.getenv("BIND", "127.0.0.1:5000")
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv("THREADS", str((os.cpu_count() or 1) * 4)))
+timeout = 30
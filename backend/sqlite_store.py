@@ -0,0 +1,409 @@
+"""
+Minimal SQLite document store with the Mongita / PyMongo collection API
+that app.py uses (find, find_one, insert_one, insert_many, update_one,
+replace_one, delete_one, count_documents, create_index, index_information).
+
+Each collection is one table:
+    id   TEXT PRIMARY KEY   -- str(_id)
+    doc  BLOB               -- the whole document, BSON encoded
+Every field passed to create_index() gets its own column + SQL index,
+so equality lookups and sorts on it run inside SQLite.
+Filters on other fields are checked in Python after decoding.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+import bson
+from bson.objectid import ObjectId
+
+InsertOneResult = namedtuple("InsertOneResult", "inserted_id")
+InsertManyResult = namedtuple("InsertManyResult", "inserted_ids")
+UpdateResult = namedtuple(
+    "UpdateResult", "matched_count modified_count upserted_id", defaults=(None,)
+)
+DeleteResult = namedtuple("DeleteResult", "deleted_count")
+
+# Documents loaded per query when find() streams a result
+_FETCH_BATCH_SIZE = 500
+
+# Values that can be stored in (and compared through) an index column
+_SCALAR_TYPES = (str, int, float, ObjectId, datetime)
+
+
+def _sql_value(value):
+    """Value as stored in an index column (None if not indexable)."""
+    if isinstance(value, bool) or not isinstance(value, _SCALAR_TYPES):
+        return None
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# -----------------------------
+# Filter / update evaluation
+# -----------------------------
+
+
+def _compare(doc_v, op, query_v):
+    if op == "$eq":
+        return doc_v == query_v
+    if op == "$ne":
+        return doc_v != query_v
+    if op == "$in":
+        return doc_v in query_v
+    if op == "$nin":
+        return doc_v not in query_v
+    try:
+        if op == "$gt":
+            return doc_v > query_v
+        if op == "$gte":
+            return doc_v >= query_v
+        if op == "$lt":
+            return doc_v < query_v
+        if op == "$lte":
+            return doc_v <= query_v
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator {op!r}")
+
+
+def _matches(doc, filter):
+    """Whether doc satisfies a (top-level) MongoDB-style filter."""
+    for key, cond in filter.items():
+        doc_v = doc.get(key)
+        if isinstance(cond, dict) and any(k.startswith("$") for k in cond):
+            if not all(_compare(doc_v, op, v) for op, v in cond.items()):
+                return False
+        elif doc_v != cond:
+            return False
+    return True
+
+
+def _apply_update(doc, update):
+    """Apply $set / $inc (top-level keys) to doc in place."""
+    for op, fields in update.items():
+        if op == "$set":
+            doc.update(fields)
+        elif op == "$inc":
+            for k, v in fields.items():
+                doc[k] = (doc.get(k) or 0) + v
+        else:
+            raise ValueError(f"Unsupported update operator {op!r}")
+
+
+def _sort_key(value):
+    """Order mixed types the way Mongita / MongoDB do (None first)."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, ObjectId):
+        return (3, value)
+    if isinstance(value, datetime):
+        return (4, value)
+    return (5, str(value))
+
+
+# -----------------------------
+# Client / database / collection
+# -----------------------------
+
+
+class SQLiteClient:
+    """client[db_name] -> SQLiteDatabase stored in <directory>/<db_name>.sqlite3"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(
+            os.path.expanduser("~"), ".smart_inventory"
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        self._databases = {}
+
+    def __getitem__(self, name):
+        if name not in self._databases:
+            path = os.path.join(self.directory, f"{name}.sqlite3")
+            self._databases[name] = SQLiteDatabase(path)
+        return self._databases[name]
+
+
+class SQLiteDatabase:
+    def __init__(self, path):
+        self.path = path
+        # One shared connection; every statement runs under self.lock
+        self.conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.RLock()
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = SQLiteCollection(self, name)
+        return self._collections[name]
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the enclosed writes (on any collection) as one transaction:
+        all of them are committed, or none if the block raises.
+        Nested calls join the outer transaction.
+        """
+        with self.lock:
+            if self.conn.in_transaction:
+                yield
+                return
+            self.conn.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+
+class SQLiteCollection:
+    def __init__(self, database, name):
+        self.name = name
+        self._conn = database.conn
+        self._lock = database.lock
+        self._transaction = database.transaction
+        self._table = _quote(name)
+        with self._lock:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} "
+                "(id TEXT PRIMARY KEY, doc BLOB NOT NULL)"
+            )
+            columns = self._conn.execute(f"PRAGMA table_info({self._table})")
+            # index column name "f_<key>" -> document key
+            self._indexed = {
+                row[1][2:]: row[1] for row in columns if row[1].startswith("f_")
+            }
+            self._index_dirs = {}
+            for _, idx_name, *_ in self._conn.execute(
+                f"PRAGMA index_list({self._table})"
+            ):
+                prefix = f"{name}__"
+                if idx_name.startswith(prefix):
+                    key, _, direction = idx_name[len(prefix):].rpartition("_")
+                    self._index_dirs[key] = int(direction)
+
+    # --- internal helpers ---
+
+    def _index_values(self, doc):
+        return [_sql_value(doc.get(key)) for key in self._indexed]
+
+    def _write(self, doc, insert=False):
+        cols = ["id", "doc"] + [_quote(c) for c in self._indexed.values()]
+        values = [str(doc["_id"]), bson.encode(doc)] + self._index_values(doc)
+        verb = "INSERT" if insert else "INSERT OR REPLACE"
+        self._conn.execute(
+            f"{verb} INTO {self._table} ({', '.join(cols)}) "
+            f"VALUES ({', '.join('?' * len(cols))})",
+            values,
+        )
+
+    def _where(self, filter):
+        """
+        SQL WHERE clause for the parts of filter SQLite can answer
+        (equality on _id or an indexed field), and whether that was all of it.
+        """
+        clauses, params = [], []
+        for key, cond in filter.items():
+            value = None
+            if isinstance(cond, dict):
+                pass
+            elif key == "_id":
+                column = "id"
+                if isinstance(cond, (ObjectId, str)):
+                    value = str(cond)
+            elif key in self._indexed:
+                column = _quote(self._indexed[key])
+                value = _sql_value(cond)
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params, len(clauses) == len(filter)
+
+    def _rows(self, filter, sort=None, limit=None):
+        """
+        Matching raw BSON docs (SQL-sorted when the sort key is indexed).
+        With a limit they are read in one query; without one, only the ids
+        are read up front and the documents follow in batches as the
+        result is consumed.
+        """
+        where, params, complete = self._where(filter)
+        order = ""
+        if sort and len(sort) == 1 and sort[0][0] in self._indexed:
+            key, direction = sort[0]
+            order = f" ORDER BY {_quote(self._indexed[key])} " + (
+                "DESC" if direction == -1 else "ASC"
+            )
+        if limit is not None:
+            sql = f"SELECT doc FROM {self._table}{where}{order}"
+            if complete:
+                sql += f" LIMIT {int(limit)}"
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            return [row[0] for row in rows], bool(order)
+
+        with self._lock:
+            ids = [
+                row[0]
+                for row in self._conn.execute(
+                    f"SELECT id FROM {self._table}{where}{order}", params
+                )
+            ]
+        return self._docs_by_id(ids), bool(order)
+
+    def _docs_by_id(self, ids):
+        """BSON docs for ids in that order (rows deleted meanwhile are skipped)."""
+        for start in range(0, len(ids), _FETCH_BATCH_SIZE):
+            batch = ids[start : start + _FETCH_BATCH_SIZE]
+            with self._lock:
+                rows = dict(
+                    self._conn.execute(
+                        f"SELECT id, doc FROM {self._table} "
+                        f"WHERE id IN ({', '.join('?' * len(batch))})",
+                        batch,
+                    )
+                )
+            for id_ in batch:
+                if id_ in rows:
+                    yield rows[id_]
+
+    def _find(self, filter, sort=None, limit=None):
+        raw_docs, sorted_in_sql = self._rows(filter, sort, limit)
+        docs = (bson.decode(raw) for raw in raw_docs)
+        if filter:
+            docs = (d for d in docs if _matches(d, filter))
+        if sort and not sorted_in_sql:
+            docs = list(docs)
+            for key, direction in reversed(sort):
+                docs.sort(key=lambda d: _sort_key(d.get(key)), reverse=direction == -1)
+        return docs
+
+    def _first(self, filter):
+        for doc in self._find(filter, limit=1):
+            return doc
+        return None
+
+    # --- public API (Mongita / PyMongo subset) ---
+
+    def find(self, filter=None, sort=None):
+        """Iterator over matching documents; sort is [(key, 1 | -1), ...]."""
+        return iter(self._find(filter or {}, sort))
+
+    def find_one(self, filter=None):
+        return self._first(filter or {})
+
+    def count_documents(self, filter):
+        if not filter:
+            with self._lock:
+                return self._conn.execute(
+                    f"SELECT COUNT(*) FROM {self._table}"
+                ).fetchone()[0]
+        return sum(1 for _ in self._find(filter))
+
+    def insert_one(self, document):
+        document = dict(document)
+        document["_id"] = document.get("_id") or ObjectId()
+        with self._lock:
+            self._write(document, insert=True)
+        return InsertOneResult(document["_id"])
+
+    def insert_many(self, documents):
+        ready = []
+        for doc in documents:
+            doc = dict(doc)
+            doc["_id"] = doc.get("_id") or ObjectId()
+            ready.append(doc)
+        with self._transaction():
+            for doc in ready:
+                self._write(doc, insert=True)
+        return InsertManyResult([d["_id"] for d in ready])
+
+    def update_one(self, filter, update):
+        with self._lock:
+            doc = self._first(filter)
+            if doc is None:
+                return UpdateResult(0, 0)
+            _apply_update(doc, update)
+            self._write(doc)
+        return UpdateResult(1, 1)
+
+    def replace_one(self, filter, replacement, upsert=False):
+        replacement = dict(replacement)
+        with self._lock:
+            doc = self._first(filter)
+            if doc is None:
+                if not upsert:
+                    return UpdateResult(0, 0)
+                replacement["_id"] = (
+                    replacement.get("_id") or filter.get("_id") or ObjectId()
+                )
+                self._write(replacement, insert=True)
+                return UpdateResult(0, 0, replacement["_id"])
+            replacement["_id"] = doc["_id"]
+            self._write(replacement)
+        return UpdateResult(1, 1)
+
+    def delete_one(self, filter):
+        with self._lock:
+            doc = self._first(filter)
+            if doc is None:
+                return DeleteResult(0)
+            self._conn.execute(
+                f"DELETE FROM {self._table} WHERE id = ?", (str(doc["_id"]),)
+            )
+        return DeleteResult(1)
+
+    def create_index(self, keys):
+        """Single-key index: keys is "field" or [("field", 1 | -1)]."""
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        if len(keys) != 1:
+            raise ValueError("Only single-key indexes are supported")
+        key, direction = keys[0]
+        column = f"f_{key}"
+        idx_name = f"{self.name}__{key}_{direction}"
+        with self._lock:
+            if key not in self._indexed:
+                self._conn.execute(
+                    f"ALTER TABLE {self._table} ADD COLUMN {_quote(column)}"
+                )
+                self._indexed[key] = column
+                # Backfill the new column from the stored documents
+                rows = self._conn.execute(f"SELECT id, doc FROM {self._table}")
+                self._conn.executemany(
+                    f"UPDATE {self._table} SET {_quote(column)} = ? WHERE id = ?",
+                    [(_sql_value(bson.decode(d).get(key)), i) for i, d in rows],
+                )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(idx_name)} ON {self._table} "
+                f"({_quote(column)} {'DESC' if direction == -1 else 'ASC'})"
+            )
+            self._index_dirs[key] = direction
+        return f"{key}_{direction}"
+
+    def index_information(self):
+        """Same shape as Mongita: [{name: {"key": [(field, direction)]}}, ...]"""
+        info = [{"_id_": {"key": [("_id", 1)]}}]
+        for key, direction in self._index_dirs.items():
+            info.append({f"{key}_{direction}": {"key": [(key, direction)]}})
+        return info
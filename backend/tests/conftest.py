@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.py opens its database at import time: point it at a throwaway folder
+_tmp_home = tempfile.mkdtemp()
+os.environ["HOME"] = _tmp_home
+os.environ["INVENTORY_DB_DIR"] = os.path.join(_tmp_home, "db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import app
+
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def new_item(client):
+    """Create an item and return its JSON."""
+
+    def make(**fields):
+        body = {"name": "Test item", "quantity": 10, "price": 2.5, "sku": "T-1"}
+        body.update(fields)
+        res = client.post("/api/items", json=body)
+        assert res.status_code == 201
+        return res.get_json()
+
+    return make
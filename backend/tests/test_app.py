@@ -0,0 +1,230 @@
+import threading
+
+import pytest
+from bson.objectid import ObjectId
+
+from sqlite_store import SQLiteClient
+
+
+class WriteDuringRead:
+    """
+    Wraps items_col so that, right after find_one() reads the given item,
+    another writer updates it -- the window a concurrent PUT could hit.
+    """
+
+    def __init__(self, col, oid, fields):
+        self._col = col
+        self._oid = oid
+        self._fields = fields
+
+    def find_one(self, filter=None, *args, **kwargs):
+        doc = self._col.find_one(filter, *args, **kwargs)
+        if self._fields and (filter or {}).get("_id") == self._oid:
+            self._col.update_one({"_id": self._oid}, {"$set": self._fields})
+            self._fields = None
+        return doc
+
+    def __getattr__(self, name):
+        return getattr(self._col, name)
+
+
+def test_invoice_stock_change_keeps_concurrent_item_edits(
+    app_module, client, new_item, monkeypatch
+):
+    item = new_item(quantity=10)
+    oid = ObjectId(item["id"])
+    monkeypatch.setattr(
+        app_module,
+        "items_col",
+        WriteDuringRead(app_module.items_col, oid, {"name": "Renamed", "price": 9.0}),
+    )
+
+    res = client.post(
+        "/api/invoices",
+        json={
+            "number": "INV-RACE",
+            "applyStockChange": True,
+            "lines": [
+                {"itemId": item["id"], "price": 2.5, "quantity": 3},
+                {"itemId": item["id"], "price": 2.5, "quantity": 1},
+            ],
+        },
+    )
+    assert res.status_code == 201
+
+    monkeypatch.undo()
+    stored = client.get(f"/api/items/{item['id']}").get_json()
+    assert stored["quantity"] == 6
+    assert stored["name"] == "Renamed"
+    assert stored["price"] == 9.0
+
+
+def test_invoice_totals_tolerate_untyped_legacy_lines(app_module, client):
+    res = app_module.invoices_col.insert_one(
+        {
+            "number": "INV-LEGACY",
+            "taxRate": None,
+            "discountRate": "10",
+            "lines": [
+                {"itemId": None, "price": None, "quantity": 2},
+                {"itemId": None, "price": "4.5", "quantity": "2"},
+            ],
+        }
+    )
+
+    inv = client.get(f"/api/invoices/{res.inserted_id}")
+    assert inv.status_code == 200
+    assert inv.get_json()["totals"]["subtotal"] == 9.0
+    assert inv.get_json()["totals"]["total"] == 8.1
+
+
+def test_list_error_is_a_plain_error_response(app_module, client, monkeypatch):
+    app_module.invoices_col.insert_one({"number": "INV-ANY", "lines": []})
+
+    def broken(doc):
+        raise TypeError("bad document")
+
+    monkeypatch.setattr(app_module, "invoice_to_dict", broken)
+    app_module.app.config["PROPAGATE_EXCEPTIONS"] = False
+    try:
+        res = client.get("/api/invoices")
+    finally:
+        app_module.app.config["PROPAGATE_EXCEPTIONS"] = None
+    assert res.status_code == 500
+
+
+def test_adjust_stock_keeps_concurrent_item_edits(
+    app_module, client, new_item, monkeypatch
+):
+    item = new_item(quantity=5)
+    oid = ObjectId(item["id"])
+    monkeypatch.setattr(
+        app_module,
+        "items_col",
+        WriteDuringRead(app_module.items_col, oid, {"name": "Edited"}),
+    )
+
+    res = client.post(f"/api/items/{item['id']}/adjust_stock", json={"delta": 2})
+    assert res.status_code == 200
+
+    monkeypatch.undo()
+    stored = client.get(f"/api/items/{item['id']}").get_json()
+    assert stored["quantity"] == 7
+    assert stored["name"] == "Edited"
+
+
+def test_item_edit_waits_for_stock_change(app_module, client, new_item):
+    item = new_item()
+    done = threading.Event()
+
+    def edit():
+        client.put(f"/api/items/{item['id']}", json={"price": 1})
+        done.set()
+
+    with app_module._stock_lock:
+        worker = threading.Thread(target=edit)
+        worker.start()
+        # update_item takes the same lock as change_stock
+        assert not done.wait(0.2)
+    worker.join(5)
+    assert done.is_set()
+
+
+def test_existing_mongita_data_is_imported_once(app_module, tmp_path):
+    from mongita import MongitaClientDisk
+
+    mongita_dir = str(tmp_path / "mongita")
+    source = MongitaClientDisk(host=mongita_dir)["inventory_db"]
+    oid = source["items"].insert_one({"name": "Old item", "quantity": 3}).inserted_id
+    source["meta"].insert_one({"_id": "batch", "n": 7})
+    target = SQLiteClient(str(tmp_path / "sqlite"))["inventory_db"]
+
+    assert app_module.import_mongita_data(target, mongita_dir) == 2
+    assert target["items"].find_one({"_id": oid})["name"] == "Old item"
+    assert target["meta"].find_one({"_id": "batch"})["n"] == 7
+
+    # later starts leave the SQLite data alone
+    assert app_module.import_mongita_data(target, mongita_dir) == 0
+    assert target["items"].count_documents({}) == 1
+
+
+def test_failed_mongita_import_is_rolled_back_and_retried(
+    app_module, tmp_path, monkeypatch
+):
+    from mongita import MongitaClientDisk
+
+    mongita_dir = str(tmp_path / "mongita")
+    source = MongitaClientDisk(host=mongita_dir)["inventory_db"]
+    source["items"].insert_one({"name": "Old item"})
+    source["invoices"].insert_one({"invoiceNumber": "INV-1"})
+    target = SQLiteClient(str(tmp_path / "sqlite"))["inventory_db"]
+
+    def fail(docs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(target["invoices"], "insert_many", fail)
+    with pytest.raises(RuntimeError):
+        app_module.import_mongita_data(target, mongita_dir)
+    # the items copied before the failure were rolled back
+    assert target["items"].count_documents({}) == 0
+    assert target["meta"].find_one({"_id": "mongita_import"}) is None
+
+    monkeypatch.undo()
+    assert app_module.import_mongita_data(target, mongita_dir) == 2
+    assert target["invoices"].find_one({})["invoiceNumber"] == "INV-1"
+
+
+@pytest.mark.parametrize(
+    "fields", [{"quantity": float("inf")}, {"price": float("nan")}, {"price": "1e999"}]
+)
+def test_item_rejects_non_finite_numbers(client, new_item, fields):
+    item = new_item()
+
+    res = client.put(f"/api/items/{item['id']}", json=fields)
+    assert res.status_code == 400
+    res = client.post("/api/items", json={"name": "Bad", **fields})
+    assert res.status_code == 400
+
+    stats = client.get("/api/stats").get_json()
+    assert stats["totalInventoryValue"] is not None
+
+
+def test_migration_survives_non_numeric_values(app_module):
+    oid = app_module.items_col.insert_one(
+        {"name": "Legacy", "quantity": "3", "minStockLevel": None, "price": "n/a"}
+    ).inserted_id
+    app_module.meta_col.delete_one({"_id": "items_numeric"})
+
+    app_module.migrate_item_numbers()
+
+    doc = app_module.items_col.find_one({"_id": oid})
+    assert (doc["quantity"], doc["minStockLevel"], doc["price"]) == (3, 0, 0.0)
+    app_module.items_col.delete_one({"_id": oid})
+
+
+def test_invoice_clamps_stock_line_by_line(client, new_item):
+    item = new_item(quantity=10)
+    lines = [
+        {"itemId": item["id"], "price": 1, "quantity": 15},
+        {"itemId": item["id"], "price": 1, "quantity": -5},
+    ]
+
+    res = client.post(
+        "/api/invoices",
+        json={"number": "INV-CLAMP", "lines": lines, "applyStockChange": True},
+    )
+    assert res.status_code == 201
+
+    # 10 - 15 -> 0, then 0 + 5 -> 5 (same as applying each line on its own)
+    assert client.get(f"/api/items/{item['id']}").get_json()["quantity"] == 5
+
+
+def test_list_is_streamed_as_valid_json(app_module, client):
+    for n in range(3):
+        app_module.invoices_col.insert_one({"number": f"INV-S{n}", "lines": []})
+
+    res = client.get("/api/invoices")
+    assert res.status_code == 200
+    assert res.is_streamed
+    numbers = [inv["number"] for inv in res.get_json()]
+    assert {"INV-S0", "INV-S1", "INV-S2"} <= set(numbers)
@@ -0,0 +1,65 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def user(client, app_module):
+    """Create a user and return (id, username, password)."""
+    app_module._auth_cache.clear()
+    username = f"user-{uuid.uuid4().hex[:8]}"
+    res = client.post(
+        "/api/users", json={"username": username, "password": "old-pass"}
+    )
+    assert res.status_code == 201
+    return res.get_json()["id"], username, "old-pass"
+
+
+@pytest.fixture
+def hash_checks(app_module, monkeypatch):
+    """Count the real password hash checks made by verify_password."""
+    calls = []
+    check = app_module.check_password_hash
+
+    def counting_check(password_hash, password):
+        calls.append(password)
+        return check(password_hash, password)
+
+    monkeypatch.setattr(app_module, "check_password_hash", counting_check)
+    return calls
+
+
+def login(client, username, password):
+    return client.post("/api/login", json={"username": username, "password": password})
+
+
+def test_cached_login_does_not_accept_wrong_password(client, user, hash_checks):
+    _, username, password = user
+
+    assert login(client, username, password).status_code == 200
+    assert login(client, username, password).status_code == 200
+    assert hash_checks == [password]  # second login served from the cache
+
+    assert login(client, username, "wrong-pass").status_code == 401
+
+
+def test_password_change_drops_cached_logins(client, user):
+    user_id, username, password = user
+    assert login(client, username, password).status_code == 200
+
+    res = client.put(f"/api/users/{user_id}/password", json={"password": "new-pass"})
+    assert res.status_code == 200
+
+    assert login(client, username, password).status_code == 401
+    assert login(client, username, "new-pass").status_code == 200
+
+
+def test_zero_ttl_bypasses_the_cache(app_module, client, user, hash_checks, monkeypatch):
+    _, username, password = user
+    monkeypatch.setitem(app_module.app.config, "AUTH_CACHE_TTL", 0)
+
+    assert login(client, username, password).status_code == 200
+    assert login(client, username, password).status_code == 200
+
+    assert hash_checks == [password, password]
+    assert not app_module._auth_cache
@@ -0,0 +1,68 @@
+import pytest
+
+CACHED_URLS = ("/api/items", "/api/stats")
+
+
+def etags(client):
+    """Current ETag of each cached listing."""
+    tags = {}
+    for url in CACHED_URLS:
+        res = client.get(url)
+        assert res.status_code == 200
+        tags[url] = res.headers["ETag"]
+    return tags
+
+
+def test_matching_etag_returns_not_modified(client, new_item):
+    new_item()
+    for url in CACHED_URLS:
+        first = client.get(url)
+        again = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304
+        assert again.data == b""
+
+
+def _create(client, item):
+    client.post("/api/items", json={"name": "Another", "quantity": 1, "price": 1})
+
+
+def _update(client, item):
+    client.put(f"/api/items/{item['id']}", json={"quantity": 3, "price": 4})
+
+
+def _delete(client, item):
+    client.delete(f"/api/items/{item['id']}")
+
+
+def _adjust_stock(client, item):
+    client.post(f"/api/items/{item['id']}/adjust_stock", json={"delta": -2})
+
+
+def _receipt(client, item):
+    client.post("/api/receipts", json={"itemId": item["id"], "quantity": 5})
+
+
+def _invoice(client, item):
+    client.post(
+        "/api/invoices",
+        json={
+            "number": "INV-CACHE",
+            "lines": [{"itemId": item["id"], "price": 2.5, "quantity": 1}],
+            "applyStockChange": True,
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "write", [_create, _update, _delete, _adjust_stock, _receipt, _invoice]
+)
+def test_item_writes_invalidate_cached_listings(client, new_item, write):
+    item = new_item(quantity=10, price=2.5)
+    before = etags(client)
+
+    write(client, item)
+
+    for url in CACHED_URLS:
+        res = client.get(url, headers={"If-None-Match": before[url]})
+        assert res.status_code == 200, url
+        assert res.headers["ETag"] != before[url], url
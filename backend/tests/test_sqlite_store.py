@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+import sqlite_store
+from sqlite_store import SQLiteClient
+
+
+@pytest.fixture
+def db(tmp_path):
+    return SQLiteClient(str(tmp_path))["test_db"]
+
+
+def test_find_one_by_id(db):
+    col = db["items"]
+    oid = col.insert_one({"name": "Bolt"}).inserted_id
+    col.insert_one({"name": "Nut"})
+
+    assert col.find_one({"_id": oid})["name"] == "Bolt"
+    assert col.find_one({"_id": ObjectId()}) is None
+
+
+def test_find_one_by_indexed_field(db):
+    col = db["users"]
+    col.create_index([("username", 1)])
+    col.insert_many([{"username": "admin", "role": "admin"}, {"username": "sam"}])
+
+    assert col.find_one({"username": "admin"})["role"] == "admin"
+    # indexed equality combined with a filter checked in Python
+    assert col.find_one({"username": "admin", "role": "staff"}) is None
+    assert col.find_one({"username": "nobody"}) is None
+
+
+def test_replace_one_upsert(db):
+    col = db["meta"]
+
+    result = col.replace_one({"_id": "batch"}, {"n": 1}, upsert=True)
+    assert (result.matched_count, result.modified_count) == (0, 0)
+    assert result.upserted_id == "batch"
+    assert col.find_one({"_id": "batch"}) == {"_id": "batch", "n": 1}
+
+    result = col.replace_one({"_id": "batch"}, {"n": 2}, upsert=True)
+    assert (result.matched_count, result.upserted_id) == (1, None)
+    assert col.find_one({"_id": "batch"}) == {"_id": "batch", "n": 2}
+    assert col.count_documents({}) == 1
+
+    assert col.replace_one({"_id": "other"}, {"n": 3}).matched_count == 0
+    assert col.count_documents({}) == 1
+
+
+def test_sort_by_indexed_key(db):
+    col = db["invoices"]
+    col.create_index([("printedAt", -1)])
+    for day in (2, 3, 1):
+        col.insert_one({"printedAt": datetime(2025, 1, day)})
+
+    days = [d["printedAt"].day for d in col.find({}, sort=[("printedAt", -1)])]
+    assert days == [3, 2, 1]
+    days = [d["printedAt"].day for d in col.find({}, sort=[("printedAt", 1)])]
+    assert days == [1, 2, 3]
+
+
+def test_sort_by_unindexed_key(db):
+    col = db["items"]
+    col.insert_many(
+        [{"name": "b", "quantity": 5}, {"name": "a"}, {"name": "c", "quantity": 1}]
+    )
+
+    names = [d["name"] for d in col.find({}, sort=[("quantity", 1)])]
+    assert names == ["a", "c", "b"]  # missing values sort first
+    names = [d["name"] for d in col.find({}, sort=[("name", -1)])]
+    assert names == ["c", "b", "a"]
+
+
+def test_create_index_backfills_existing_rows(db, tmp_path):
+    col = db["receipts"]
+    col.insert_many([{"sku": "A-1", "qty": 1}, {"sku": "B-2", "qty": 2}])
+
+    col.create_index([("sku", 1)])
+
+    assert {"sku_1": {"key": [("sku", 1)]}} in col.index_information()
+    assert col.find_one({"sku": "B-2"})["qty"] == 2
+    assert [d["sku"] for d in col.find({}, sort=[("sku", 1)])] == ["A-1", "B-2"]
+
+    # the index survives reopening the database
+    reopened = SQLiteClient(str(tmp_path))["test_db"]["receipts"]
+    assert reopened.find_one({"sku": "A-1"})["qty"] == 1
+
+
+def test_find_streams_in_batches(db, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "_FETCH_BATCH_SIZE", 2)
+    col = db["invoices"]
+    col.create_index([("n", -1)])
+    col.insert_many([{"n": n} for n in range(5)])
+
+    assert [d["n"] for d in col.find({}, sort=[("n", -1)])] == [4, 3, 2, 1, 0]
+
+    docs = col.find({}, sort=[("n", 1)])
+    assert next(docs)["n"] == 0
+    col.delete_one({"n": 3})  # removed before its batch is read
+    assert [d["n"] for d in docs] == [1, 2, 4]